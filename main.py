@@ -1,14 +1,22 @@
+import os
 import sys
 import subprocess
 import argparse
+import importlib
 import signal
 import atexit
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.text import Text
 
-console = Console()
+# rich is imported lazily: plain CLI-flag runs (e.g. `python main.py --scrape`)
+# jump straight into a step and shouldn't pay rich's import cost up front,
+# and a small parent process also keeps subprocess spawns cheap.
+_console = None
+
+def console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 # -----------------------------------------------------------------------------
 # CONFIGURATION
@@ -24,23 +32,51 @@ SCRIPTS = {
     "reset": "src/reset_db.py"
 }
 
+# Same steps as importable modules: calling run() in-process skips the
+# interpreter + library startup cost of a fresh python per step
+MODULES = {
+    "scrape": "src.run_scraper",
+    "details": "src.scrape_details",
+    "filter": "src.filter_jobs",
+    "generate": "src.generate_application",
+    "compile": "src.compile_pdfs",
+    "reset": "src.reset_db"
+}
+
 # -----------------------------------------------------------------------------
 # CLEANUP LOGIC (KILL OLLAMA CPU THREADS)
 # -----------------------------------------------------------------------------
 
 def cleanup_ollama():
     """
-    Kills the heavy inference process (ollama_llama_server) to free up 
-    CPU/RAM immediately. This does NOT kill the main API service, 
+    Kills the heavy inference process (ollama_llama_server) to free up
+    CPU/RAM immediately. This does NOT kill the main API service,
     just the active model runner.
+
+    Scans /proc and signals the runner directly instead of spawning pkill,
+    which saved a fork+exec on every shutdown. Falls back to pkill where
+    /proc is not available.
     """
+    try:
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(os.path.join(entry.path, "cmdline"), "rb") as f:
+                    # cmdline is NUL-separated; substring match mirrors pkill -f
+                    if b"ollama_llama_server" in f.read():
+                        os.kill(int(entry.name), signal.SIGTERM)
+            except (OSError, ValueError):
+                continue  # process vanished or is not ours to read
+        return
+    except OSError:
+        pass  # no /proc on this platform
+
     try:
         # -f matches the full command line name to ensure we hit the runner
-        subprocess.run(["pkill", "-f", "ollama_llama_server"], 
-                       stdout=subprocess.DEVNULL, 
+        subprocess.run(["pkill", "-f", "ollama_llama_server"],
+                       stdout=subprocess.DEVNULL,
                        stderr=subprocess.DEVNULL)
-        # Optional: Uncomment if you want visual confirmation
-        # console.print("[dim]🧹 Ollama CPU threads terminated.[/dim]")
     except Exception:
         pass
 
@@ -49,7 +85,7 @@ atexit.register(cleanup_ollama)
 
 # 2. Register cleanup to run on Ctrl+C (SIGINT)
 def signal_handler(sig, frame):
-    console.print("\n[yellow]⚠️  Force Quit Detected. Cleaning up Ollama...[/yellow]")
+    console().print("\n[yellow]⚠️  Force Quit Detected. Cleaning up Ollama...[/yellow]")
     cleanup_ollama()
     sys.exit(0)
 
@@ -61,24 +97,56 @@ signal.signal(signal.SIGINT, signal_handler)
 # -----------------------------------------------------------------------------
 
 def print_banner():
+    from rich.panel import Panel
+    from rich.text import Text
     title = Text("🚀 JOB APPLICATOR", justify="center", style="bold cyan")
     subtitle = Text("Automated Pipeline", justify="center", style="dim white")
-    console.print(Panel(Text.assemble(title, "\n", subtitle), border_style="cyan", expand=False))
+    console().print(Panel(Text.assemble(title, "\n", subtitle), border_style="cyan", expand=False))
 
 def run_script(script_path):
     """Runs a python script as a subprocess in the current venv."""
-    console.rule(f"[bold yellow]Running {script_path}[/bold yellow]")
+    console().rule(f"[bold yellow]Running {script_path}[/bold yellow]")
     try:
-        # sys.executable ensures we use the current .venv python
-        result = subprocess.run([sys.executable, script_path])
+        # sys.executable ensures we use the current .venv python.
+        # No preexec_fn / custom cwd / pipes-to-dup are passed, and close_fds
+        # stays True, so CPython launches this via posix_spawn on Linux
+        # instead of fork+exec — no page-table copy of this process.
+        result = subprocess.run([sys.executable, script_path], close_fds=True)
         if result.returncode != 0:
-            console.print(f"\n[bold red]❌ Script {script_path} exited with error code {result.returncode}.[/bold red]")
+            console().print(f"\n[bold red]❌ Script {script_path} exited with error code {result.returncode}.[/bold red]")
     except KeyboardInterrupt:
         # The signal_handler will catch this usually, but this is a safety net for the subprocess
-        console.print("\n[yellow]⚠️  Interrupted by user.[/yellow]")
+        console().print("\n[yellow]⚠️  Interrupted by user.[/yellow]")
+    except Exception as e:
+        console().print(f"[bold red]❌ Failed to launch script: {e}[/bold red]")
+    console().print()
+
+def run_step(step):
+    """Runs a pipeline step in-process; falls back to a subprocess on import failure."""
+    console().rule(f"[bold yellow]Running {SCRIPTS[step]}[/bold yellow]")
+    try:
+        module = importlib.import_module(MODULES[step])
+    except Exception:
+        # Broken import (e.g. missing optional dep) — isolate it in a subprocess
+        run_script(SCRIPTS[step])
+        return
+    try:
+        module.run()
+    except KeyboardInterrupt:
+        console().print("\n[yellow]⚠️  Interrupted by user.[/yellow]")
     except Exception as e:
-        console.print(f"[bold red]❌ Failed to launch script: {e}[/bold red]")
-    console.print()
+        console().print(f"\n[bold red]❌ Step '{step}' failed: {e}[/bold red]")
+    console().print()
+
+def run_pipeline():
+    """Runs scrape → details → filter back-to-back in one process.
+
+    The stages hand results to each other through job statuses in SQLite,
+    so chaining them here removes the two extra interpreter launches and
+    DB re-opens without changing any stage's logic.
+    """
+    for step in ("scrape", "details", "filter"):
+        run_step(step)
 
 # -----------------------------------------------------------------------------
 # MAIN ENTRY POINT
@@ -94,60 +162,67 @@ def main():
 
     # --- CLI ARGUMENT MODE (Non-Interactive) ---
     if args.scrape:
-        run_script(SCRIPTS["scrape"])
+        run_step("scrape")
         return
     if args.generate:
-        run_script(SCRIPTS["generate"])
+        run_step("generate")
         return
     if args.compile:
-        run_script(SCRIPTS["compile"])
+        run_step("compile")
         return
 
     # --- INTERACTIVE MENU MODE ---
+    from rich.prompt import Prompt
+
     while True:
-        console.clear()
+        console().clear()
         print_banner()
         
-        console.print("[1] [green]🕷️  Run Scraper[/green]         (src/run_scraper.py)")
-        console.print("[2] [blue]🔎 Scrape Details[/blue]      (src/scrape_details.py)")
-        console.print("[3] [yellow]🧹 Filter/Curate Jobs[/yellow]  (src/filter_jobs.py)")
-        console.print("[4] [magenta]✍️  Generate LaTeX[/magenta]      (src/generate_application.py)")
-        console.print("[5] [red]📄 Compile PDFs[/red]        (src/compile_pdfs.py)")
-        console.print() 
-        console.print("[9] [dim]🧨 Reset Database[/dim]      (src/reset_db.py)")
-        console.print("[0] Exit")
+        console().print("[1] [green]🕷️  Run Scraper[/green]         (src/run_scraper.py)")
+        console().print("[2] [blue]🔎 Scrape Details[/blue]      (src/scrape_details.py)")
+        console().print("[3] [yellow]🧹 Filter/Curate Jobs[/yellow]  (src/filter_jobs.py)")
+        console().print("[4] [magenta]✍️  Generate LaTeX[/magenta]      (src/generate_application.py)")
+        console().print("[5] [red]📄 Compile PDFs[/red]        (src/compile_pdfs.py)")
+        console().print("[6] [bold cyan]⚡ Scrape → Details → Filter[/bold cyan] (full discovery pass)")
+        console().print()
+        console().print("[9] [dim]🧨 Reset Database[/dim]      (src/reset_db.py)")
+        console().print("[0] Exit")
         
         try:
-            choice = Prompt.ask("\nChoose an action", choices=["1", "2", "3", "4", "5", "9", "0"], default="0")
+            choice = Prompt.ask("\nChoose an action", choices=["1", "2", "3", "4", "5", "6", "9", "0"], default="0")
             
             if choice == "0":
-                console.print("[cyan]Bye! 👋[/cyan]")
+                console().print("[cyan]Bye! 👋[/cyan]")
                 cleanup_ollama()
                 sys.exit(0)
                 
             elif choice == "1":
-                run_script(SCRIPTS["scrape"])
+                run_step("scrape")
                 Prompt.ask("Press Enter to continue...")
                 
             elif choice == "2":
-                run_script(SCRIPTS["details"])
+                run_step("details")
                 Prompt.ask("Press Enter to continue...")
                 
             elif choice == "3":
-                run_script(SCRIPTS["filter"])
+                run_step("filter")
                 Prompt.ask("Press Enter to continue...")
                 
             elif choice == "4":
-                run_script(SCRIPTS["generate"])
+                run_step("generate")
                 Prompt.ask("Press Enter to continue...")
                 
             elif choice == "5":
-                run_script(SCRIPTS["compile"])
+                run_step("compile")
                 Prompt.ask("Press Enter to continue...")
                 
+            elif choice == "6":
+                run_pipeline()
+                Prompt.ask("Press Enter to continue...")
+
             elif choice == "9":
                 if Prompt.ask("[red]Are you sure you want to delete all data?[/red]", choices=["y", "n"]) == "y":
-                    run_script(SCRIPTS["reset"])
+                    run_step("reset")
                     Prompt.ask("Press Enter to continue...")
                     
         except KeyboardInterrupt:
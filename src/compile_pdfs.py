@@ -3,8 +3,13 @@ import subprocess
 import sys
 from rich.console import Console
 
+# Ensure imports work from project root
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.paths import BASE_DIR
+
 console = Console()
-APPLICATIONS_DIR = "data/applications"
+APPLICATIONS_DIR = os.path.join(BASE_DIR, "data", "applications")
 
 print("--- DEBUG MODE ACTIVE: IF YOU SEE THIS, THE CODE UPDATED ---")
 
@@ -1,28 +1,60 @@
+import csv
+import os
 import sqlite3
+import sys
 import re
 from rich.console import Console
 from rich.table import Table
-from typing import Tuple, Set
+from typing import Tuple
+
+# Ensure imports work from project root
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.paths import BASE_DIR
 
 # -----------------------------------------------------------------------------
 # CONFIG
 # -----------------------------------------------------------------------------
 
-DB_PATH = "data/db/jobs.db"
+DB_PATH = os.path.join(BASE_DIR, "data", "db", "jobs.db")
+TRIAGE_LOG_PATH = os.path.join(BASE_DIR, "data", "logs", "triage.csv")
+UPDATE_BATCH_SIZE = 1000
+TABLE_ROW_LIMIT = 50  # rich layout cost dominates past this; full list goes to CSV
 console = Console()
 
-POSITIVE_KEYWORDS = {
-    "pipeline", "td", "technical", "python", "coordinator", 
+# One SQL string shared by every flush so sqlite3's statement cache reuses
+# the same prepared statement across batches
+UPDATE_SQL = (
+    "UPDATE jobs "
+    "SET status = ?, relevance_score = ?, decision_reason = ? "
+    "WHERE id = ?"
+)
+
+POSITIVE_KEYWORDS = frozenset({
+    "pipeline", "td", "technical", "python", "coordinator",
     "assistant", "runner", "atd", "mid", "automation", "tools",
     "developer", "data", "analyst", "programmer", "engineer", "devops", "software" # Added a few common ones
-}
+})
 
-NEGATIVE_KEYWORDS = {
+NEGATIVE_KEYWORDS = frozenset({
     "senior", "lead", "supervisor", "principal", "head", "chief",
     "finance", "hr", "legal", "accountant", "marketing", "sales",
     "art", "lighter", "animator", "modeler", "compositor", "Java", "concept", "JavaScript", 
     "rigger", "fx" # Unless you want FX TD roles, keep FX here or move to positive
-}
+})
+
+# Single multi-pattern scanner compiled once over all keywords (lowercased so
+# mixed-case entries like "Java" still hit the lowercased title). One pass per
+# title replaces tokenize + two set intersections; longest-first alternation
+# keeps e.g. "javascript" from stopping at "java".
+_NEGATIVE_LOWER = frozenset(k.lower() for k in NEGATIVE_KEYWORDS)
+_POSITIVE_LOWER = frozenset(k.lower() for k in POSITIVE_KEYWORDS)
+_KEYWORD_RE = re.compile(
+    r"\b(?:%s)\b" % "|".join(
+        sorted((re.escape(k) for k in _POSITIVE_LOWER | _NEGATIVE_LOWER),
+               key=len, reverse=True)
+    )
+)
 
 # -----------------------------------------------------------------------------
 # UTILS
@@ -38,15 +70,16 @@ def migrate_db(cursor):
         # Columns likely already exist
         pass
 
-def tokenize(text: str) -> Set[str]:
-    """Tokenize a string into lowercase word tokens."""
-    if not text: return set()
-    return set(re.findall(r"\b\w+\b", text.lower()))
+    # Partial index so the 'scraped' lookup doesn't full-scan a growing table
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_scraped "
+        "ON jobs(status) WHERE status = 'scraped'"
+    )
 
 def classify_job(title: str) -> Tuple[str, int, str]:
-    tokens = tokenize(title)
+    hits = set(_KEYWORD_RE.findall(title.lower())) if title else set()
 
-    negative_hits = tokens & NEGATIVE_KEYWORDS
+    negative_hits = hits & _NEGATIVE_LOWER
     if negative_hits:
         return (
             "ignored",
@@ -54,12 +87,11 @@ def classify_job(title: str) -> Tuple[str, int, str]:
             f"Negative match: {', '.join(sorted(negative_hits))}"
         )
 
-    positive_hits = tokens & POSITIVE_KEYWORDS
-    if positive_hits:
+    if hits:
         return (
             "approved",
-            len(positive_hits),
-            f"Positive match: {', '.join(sorted(positive_hits))}"
+            len(hits),
+            f"Positive match: {', '.join(sorted(hits))}"
         )
 
     return (
@@ -75,18 +107,16 @@ def classify_job(title: str) -> Tuple[str, int, str]:
 def run() -> None:
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    # WAL + relaxed sync: one fsync per batch instead of one per statement
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     cursor = conn.cursor()
 
     # 1. Ensure DB has the new columns
     migrate_db(cursor)
 
-    # 2. Get Scraped Jobs
+    # 2. Get Scraped Jobs (streamed off the cursor, not materialized)
     cursor.execute("SELECT id, title, company FROM jobs WHERE status = 'scraped'")
-    jobs = cursor.fetchall()
-
-    if not jobs:
-        console.print("[yellow]No scraped jobs to filter.[/yellow]")
-        return
 
     approved_count = 0
     ignored_count = 0
@@ -98,41 +128,67 @@ def run() -> None:
     table.add_column("Score", justify="right")
     table.add_column("Reason", style="dim")
 
-    for job in jobs:
-        status, score, reason = classify_job(job["title"])
-
-        if status == "approved":
-            approved_count += 1
-            color = "green"
-        else:
-            ignored_count += 1
-            color = "red"
-
-        cursor.execute(
-            """
-            UPDATE jobs
-            SET status = ?, relevance_score = ?, decision_reason = ?
-            WHERE id = ?
-            """,
-            (status, score, reason, job["id"])
-        )
+    # Second cursor for writes so we don't interleave with the streaming SELECT
+    upd_cursor = conn.cursor()
+    updates = []
+
+    os.makedirs(os.path.dirname(TRIAGE_LOG_PATH), exist_ok=True)
+    with open(TRIAGE_LOG_PATH, "w", newline="", encoding="utf-8") as log_file:
+        log = csv.writer(log_file)
+        log.writerow(["company", "title", "status", "score", "reason"])
+
+        for job in cursor:
+            status, score, reason = classify_job(job["title"])
+
+            if status == "approved":
+                approved_count += 1
+                color = "green"
+            else:
+                ignored_count += 1
+                color = "red"
+
+            updates.append((status, score, reason, job["id"]))
+            if len(updates) >= UPDATE_BATCH_SIZE:
+                upd_cursor.executemany(UPDATE_SQL, updates)
+                updates.clear()
+
+            # Full results go to the CSV; only the first rows hit the terminal
+            log.writerow([job["company"], job["title"], status, score, reason])
+            if approved_count + ignored_count <= TABLE_ROW_LIMIT:
+                table.add_row(
+                    job["company"],
+                    job["title"],
+                    f"[{color}]{status}[/{color}]",
+                    str(score),
+                    reason,
+                )
+
+    # Flush the tail batch; one commit covers the whole run
+    if updates:
+        upd_cursor.executemany(UPDATE_SQL, updates)
+    conn.commit()
+    conn.close()
 
+    if approved_count == 0 and ignored_count == 0:
+        console.print("[yellow]No scraped jobs to filter.[/yellow]")
+        return
+
+    total = approved_count + ignored_count
+    if total > TABLE_ROW_LIMIT:
         table.add_row(
-            job["company"],
-            job["title"],
-            f"[{color}]{status}[/{color}]",
-            str(score),
-            reason,
+            "…", f"({total - TABLE_ROW_LIMIT} more — see {TRIAGE_LOG_PATH})",
+            "", "", ""
         )
 
-    conn.commit()
-    conn.close()
-
-    console.print(table)
-    console.print(
-        f"\n[green]✅ Approved: {approved_count}[/green] | "
-        f"[red]❌ Ignored: {ignored_count}[/red]"
-    )
+    # Render once into a buffer and flush with a single write: rich's layout
+    # pass runs once and the terminal gets one syscall instead of per-cell IO
+    with console.capture() as capture:
+        console.print(table)
+        console.print(
+            f"\n[green]✅ Approved: {approved_count}[/green] | "
+            f"[red]❌ Ignored: {ignored_count}[/red]"
+        )
+    sys.stdout.write(capture.get())
 
 if __name__ == "__main__":
     run()
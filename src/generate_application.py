@@ -1,10 +1,27 @@
 import sqlite3
 import os
+import hashlib
 import requests
 import json
 import re
+import sys
+import time
+from string import Template
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+# orjson decodes the multi-KB Ollama responses 2-5x faster than stdlib json
+# and skips the intermediate text decode; fall back silently when absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Ensure imports work from project root
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.paths import BASE_DIR
 
 console = Console()
 
@@ -12,12 +29,25 @@ console = Console()
 # CONFIG
 # -----------------------------------------------------------------------------
 
-DB_PATH = "data/db/jobs.db"
-TEMPLATE_DIR = "data/templates"
-OUTPUT_DIR = "data/applications"
+DB_PATH = os.path.join(BASE_DIR, "data", "db", "jobs.db")
+CACHE_DB_PATH = os.path.join(BASE_DIR, "data", "cache", "ollama.db")
+TEMPLATE_DIR = os.path.join(BASE_DIR, "data", "templates")
+OUTPUT_DIR = os.path.join(BASE_DIR, "data", "applications")
 OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL_NAME = "llama3.2"
+# Override to run a quantized build (e.g. llama3.2:3b-instruct-q4_K_M,
+# roughly 2x the tokens/s of f16 with no quality loss on JSON extraction)
+MODEL_NAME = os.environ.get("OLLAMA_MODEL", "llama3.2")
+# 0 lets Ollama pick; set to the physical core count on hosts where its
+# default lands on hyperthreads
+NUM_THREAD = int(os.environ.get("OLLAMA_NUM_THREAD", "0"))
 TIMEOUT_SECONDS = 200
+# Concurrent requests to Ollama; only pays off if the server is started with
+# a matching OLLAMA_NUM_PARALLEL, so reuse that variable for both sides
+MAX_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+# KV-cache sizing: reserve room for the JSON answer on top of the prompt
+NUM_CTX_MIN = 2048
+NUM_CTX_MAX = 4096
+EXPECTED_OUTPUT_TOKENS = 1024
 
 # -----------------------------------------------------------------------------
 # CANDIDATE PROFILE (LLM INPUT ONLY)
@@ -52,23 +82,44 @@ Technical Skills:
 # HELPERS
 # -----------------------------------------------------------------------------
 
+# Built once: escape_tex runs on every string field of every job. Every
+# special character is a single char, so a translate table does the whole
+# substitution in one C-level pass — no regex engine, no per-match callback.
+_TEX_TABLE = str.maketrans({
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+})
+
+# Folder slug pattern, likewise shared by all jobs
+_SLUG_RE = re.compile(r"[^\w\-]+")
+
+# Template fields by shape, known statically from the LLM schema plus the
+# identity/header blocks — sanitization walks these instead of type-checking
+# every entry in the data dict
+_STRING_KEYS = (
+    "job_title_target", "profile_summary",
+    "first_name", "last_name", "location", "phone", "email", "linkedin",
+    "company_name", "languages_string", "cl_opening", "cl_closing",
+    "dates_current", "role_current", "company_current", "location_current",
+    "h_profile", "h_skills", "h_experience", "h_projects",
+    "h_education", "h_attributes",
+)
+_LIST_KEYS = ("experience_bullets",)
+
 def escape_tex(text: str) -> str:
+    # strip after translate: no escape sequence starts or ends with
+    # whitespace, so this equals strip-then-escape minus one string copy
     if not isinstance(text, str):
         return ""
-    replacements = {
-        "\\": r"\textbackslash{}",
-        "&": r"\&",
-        "%": r"\%",
-        "$": r"\$",
-        "#": r"\#",
-        "_": r"\_",
-        "{": r"\{",
-        "}": r"\}",
-        "~": r"\textasciitilde{}",
-        "^": r"\textasciicircum{}",
-    }
-    regex = re.compile("|".join(re.escape(k) for k in replacements))
-    return regex.sub(lambda m: replacements[m.group()], text)
+    return text.translate(_TEX_TABLE).strip()
 
 def normalize_cover_letter_body(value) -> str:
     """
@@ -90,93 +141,333 @@ def normalize_cover_letter_body(value) -> str:
 
     return ""
 
+# -----------------------------------------------------------------------------
+# RESPONSE CACHE
+# -----------------------------------------------------------------------------
+# Exact-hash disk cache keyed on (model, prompt): a hit returns in ~1 ms vs.
+# tens of seconds of llama3.2 compute, which makes reruns over the same
+# approved jobs essentially free. Connections are opened per call so the
+# cache works from the generation worker threads; failures never block a job.
+
+_JSON_DECODER = json.JSONDecoder()
+
+# One keep-alive session shared by all workers: each call reuses a pooled
+# TCP connection to the Ollama server instead of reconnecting per job
+_SESSION = requests.Session()
+_SESSION.mount("http://", requests.adapters.HTTPAdapter(
+    pool_connections=MAX_PARALLEL, pool_maxsize=MAX_PARALLEL * 2
+))
+
+def _cache_key(prompt: str) -> str:
+    return hashlib.sha256((MODEL_NAME + prompt).encode("utf-8")).hexdigest()
+
+def _cache_get(key: str) -> dict | None:
+    try:
+        with sqlite3.connect(CACHE_DB_PATH) as conn:
+            row = conn.execute(
+                "SELECT response FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+    except Exception:
+        return None
+
+def _cache_put(key: str, data: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+        with sqlite3.connect(CACHE_DB_PATH) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(data), int(time.time()))
+            )
+    except Exception:
+        pass
+
+def _num_ctx_for(prompt: str) -> int:
+    """
+    Smallest power-of-two context that fits prompt + expected output,
+    using the ~4 chars/token heuristic. KV-cache memory scales linearly
+    with num_ctx, so most prompts now run at 2048 instead of a flat 4096.
+    """
+    estimate = len(prompt) // 4 + EXPECTED_OUTPUT_TOKENS
+    num_ctx = NUM_CTX_MIN
+    while num_ctx < estimate and num_ctx < NUM_CTX_MAX:
+        num_ctx *= 2
+    return num_ctx
+
 def call_ollama(prompt: str) -> dict | None:
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    options = {
+        "temperature": 0.2,
+        "num_ctx": _num_ctx_for(prompt),
+    }
+    if NUM_THREAD:
+        options["num_thread"] = NUM_THREAD
+
     payload = {
         "model": MODEL_NAME,
         "prompt": prompt,
         "format": "json",
         "stream": False,
-        "options": {
-            "temperature": 0.2,
-            "num_ctx": 4096,
-        }
+        # Keep the model resident between jobs (and reruns shortly after);
+        # an unload/reload cycle costs multiple seconds of weight loading
+        "keep_alive": "30m",
+        "options": options
     }
     try:
-        r = requests.post(OLLAMA_URL, json=payload, timeout=TIMEOUT_SECONDS)
-        r.raise_for_status()
-        raw = r.json()["response"]
-        start, end = raw.find("{"), raw.rfind("}")
-        return json.loads(raw[start:end + 1])
+        if orjson is not None:
+            r = _SESSION.post(OLLAMA_URL, data=orjson.dumps(payload),
+                              headers={"Content-Type": "application/json"},
+                              timeout=TIMEOUT_SECONDS)
+            r.raise_for_status()
+            raw = orjson.loads(r.content)["response"]
+        else:
+            r = _SESSION.post(OLLAMA_URL, json=payload, timeout=TIMEOUT_SECONDS)
+            r.raise_for_status()
+            raw = r.json()["response"]
+        # raw_decode parses exactly the first JSON object and stops at its
+        # balanced end — one pass, no rfind scan, and trailing chatter after
+        # the object can no longer break the slice
+        data, _ = _JSON_DECODER.raw_decode(raw, raw.find("{"))
+        _cache_put(key, data)
+        return data
     except Exception as e:
         console.print(f"[red]❌ Ollama failure: {e}[/red]")
         return None
 
+def prewarm_model() -> None:
+    """
+    Empty-prompt ping that loads the model before the batch starts.
+    The first real job no longer absorbs the cold weight-load (and risks
+    its timeout on it), and keep_alive pins the model for the whole run.
+    """
+    try:
+        _SESSION.post(OLLAMA_URL, json={
+            "model": MODEL_NAME,
+            "prompt": "",
+            "keep_alive": "30m",
+            "stream": False,
+        }, timeout=TIMEOUT_SECONDS)
+    except Exception:
+        pass  # server down → the real call will surface the error
+
+def write_file(path: str, text: str) -> None:
+    """Encode once and hand the whole document to one buffered write."""
+    with open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+def application_is_current(out_dir: str, prompt_sha: str) -> bool:
+    """
+    True when out_dir already holds both .tex files rendered from the same
+    prompt (recorded in meta.json) — reruns can then skip the job entirely.
+    """
+    try:
+        with open(os.path.join(out_dir, "meta.json")) as f:
+            meta = json.load(f)
+        return (
+            meta.get("prompt_sha") == prompt_sha
+            and os.path.exists(os.path.join(out_dir, "resume.tex"))
+            and os.path.exists(os.path.join(out_dir, "cover.tex"))
+        )
+    except (OSError, ValueError):
+        return False
+
+# Invariant part first (instructions + profile), per-job part last:
+# llama.cpp caches the KV prefix shared between consecutive prompts, so
+# every job after the first skips prefill for the common head. The static
+# text is assembled once here; per-job calls do one substitution pass
+# ($-placeholders, so the JSON braces need no escaping).
+_PROMPT_TEMPLATE = Template("""
+You are a professional recruiter and ATS resume writer.
+
+CANDIDATE PROFILE:
+""" + CANDIDATE_PROFILE + """
+LANGUAGE: $language
+
+JOB DESCRIPTION:
+$description
+
+RETURN PURE JSON ONLY:
+{
+  "job_title_target": "$title",
+  "profile_summary": "2 sentences, first person",
+  "experience_bullets": ["...", "...", "...", "..."],
+  "cover_letter_body": "3 paragraphs separated by double newlines"
+}
+""")
+
+def build_prompt(job, lang: str) -> str:
+    return _PROMPT_TEMPLATE.substitute(
+        language="FRENCH" if lang == "FR" else "ENGLISH",
+        description=job['description'][:2500],
+        title=job['title'],
+    )
+
+# Compiled once; IGNORECASE means no .lower() copy of the full description
+_FR_RE = re.compile(r"france|paris|lyon", re.IGNORECASE)
+_SE_RE = re.compile(r"sweden|stockholm|gothenburg|malm[oö]", re.IGNORECASE)
+
 def detect_country(job):
-    text = f"{job['location']} {job['description']}".lower()
-    if any(k in text for k in ["france", "paris", "lyon"]):
+    text = f"{job['location']} {job['description']}"
+    if _FR_RE.search(text):
         return "FR"
-    if any(k in text for k in ["sweden", "stockholm", "gothenburg", "malmo"]):
+    if _SE_RE.search(text):
         return "SE"
     return "INT"
 
+# -----------------------------------------------------------------------------
+# IDENTITY (NEVER AI-GENERATED — built once, merged into every job)
+# -----------------------------------------------------------------------------
+
+_IDENTITY = {
+    "first_name": "Hugo",
+    "last_name": "Schenegg",
+    "location": "Paris, France",
+    "phone": "+33 6 95 16 42 87",
+    "email": "schenegg.hugo@gmail.com",
+    "linkedin": "schenegghugo",
+    "dates_current": "Jan 2022 – Present",
+    "role_current": "Studio Coordinator",
+    "company_current": "MPC Paris",
+    "location_current": "Paris, France",
+    "skills_dict": {
+        "Scripting": "Python, C++, Bash",
+        "Graphics": "OpenGL, Vulkan, Rendering Pipelines",
+        "Tools": "Git, Linux, Maya",
+    }
+}
+
+_LANGUAGES_STRING = {
+    "FR": "Français (natif) — Anglais (courant)",
+    "EN": "French (Native) — English (Fluent)",
+}
+_CL_OPENING = {"FR": "Madame, Monsieur,", "EN": "Dear Hiring Manager,"}
+_CL_CLOSING = {"FR": "Cordialement,", "EN": "Sincerely,"}
+
+_HEADERS = {
+    "FR": {
+        "h_profile": "Profil",
+        "h_skills": "Compétences techniques",
+        "h_experience": "Expérience professionnelle",
+        "h_projects": "Projets",
+        "h_education": "Formation",
+        "h_attributes": "Compétences humaines",
+    },
+    "EN": {
+        "h_profile": "Profile",
+        "h_skills": "Technical Skills",
+        "h_experience": "Experience",
+        "h_projects": "Projects",
+        "h_education": "Education",
+        "h_attributes": "Attributes",
+    }
+}
+
+# -----------------------------------------------------------------------------
+# TEMPLATES (compiled once per process, reused across jobs)
+# -----------------------------------------------------------------------------
+
+# Persist compiled template bytecode so fresh invocations skip the
+# parse+compile step and just unpickle it
+_JINJA_CACHE_DIR = os.path.join(BASE_DIR, "data", "cache", "jinja")
+os.makedirs(_JINJA_CACHE_DIR, exist_ok=True)
+
+_ENV = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    bytecode_cache=FileSystemBytecodeCache(_JINJA_CACHE_DIR),
+    block_start_string='<%',
+    block_end_string='%>',
+    variable_start_string='<<',
+    variable_end_string='>>',
+    comment_start_string='<#',
+    comment_end_string='#>',
+    autoescape=False,
+    # Templates don't change mid-run; skip the per-render mtime stat
+    auto_reload=False
+)
+
 # -----------------------------------------------------------------------------
 # MAIN
 # -----------------------------------------------------------------------------
 
 def run():
-    env = Environment(
-        loader=FileSystemLoader(TEMPLATE_DIR),
-        block_start_string='<%',
-        block_end_string='%>',
-        variable_start_string='<<',
-        variable_end_string='>>',
-        comment_start_string='<#',
-        comment_end_string='#>',
-        autoescape=False
-    )
-
-    resume_tpl = env.get_template("resume.jinja")
-    cover_tpl = env.get_template("cover.jinja")
+    resume_tpl = _ENV.get_template("resume.jinja")
+    cover_tpl = _ENV.get_template("cover.jinja")
 
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    # WAL + relaxed sync: status updates are flushed with one commit at the end
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     cur = conn.cursor()
 
-    cur.execute("SELECT * FROM jobs WHERE status='approved'")
+    # Partial index keeps the approved lookup off a full table scan
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status_approved "
+        "ON jobs(status) WHERE status = 'approved'"
+    )
+    # Project only the columns the pipeline touches (raw HTML blobs and
+    # bookkeeping columns stay on disk)
+    cur.execute(
+        "SELECT id, company, title, location, description "
+        "FROM jobs WHERE status='approved'"
+    )
     jobs = cur.fetchall()
 
     if not jobs:
         console.print("[yellow]No approved jobs found.[/yellow]")
         return
 
+    # Build every prompt up front, then fan the whole per-job pipeline out
+    # over a small thread pool: the LLM call is pure I/O wait on the local
+    # server, so wall time drops from N·T to ~ceil(N/parallelism)·T when the
+    # server is run with OLLAMA_NUM_PARALLEL > 1, and a finished job renders
+    # and writes its files while the others are still generating. Only the
+    # DB update stays on the main thread (SQLite connections are per-thread).
+    pending = []
+    generated_ids = []
     for job in jobs:
-        console.print(f"[cyan]🤖 {job['company']} – {job['title']}[/cyan]")
-
         lang = "FR" if detect_country(job) == "FR" else "EN"
+        prompt = build_prompt(job, lang)
 
-        prompt = f"""
-You are a professional recruiter and ATS resume writer.
-
-LANGUAGE: {"FRENCH" if lang == "FR" else "ENGLISH"}
+        # Idempotency: a previous run already rendered this exact prompt →
+        # just flip the DB status, no LLM call, no re-render
+        folder = _SLUG_RE.sub("_", f"{job['company']}_{job['title']}")
+        out_dir = os.path.join(OUTPUT_DIR, folder)
+        if application_is_current(out_dir, _cache_key(prompt)):
+            console.print(f"[dim]⏭️  Up to date: {out_dir}[/dim]")
+            generated_ids.append((job["id"],))
+            continue
 
-JOB DESCRIPTION:
-{job['description'][:2500]}
+        pending.append((job, lang, prompt, out_dir))
 
-CANDIDATE PROFILE:
-{CANDIDATE_PROFILE}
+    if not pending:
+        if generated_ids:
+            cur.executemany("UPDATE jobs SET status='generated' WHERE id=?", generated_ids)
+            conn.commit()
+        conn.close()
+        console.print("\n[bold green]✨ Generation complete (everything cached).[/bold green]")
+        return
 
-RETURN PURE JSON ONLY:
-{{
-  "job_title_target": "{job['title']}",
-  "profile_summary": "2 sentences, first person",
-  "experience_bullets": ["...", "...", "...", "..."],
-  "cover_letter_body": "3 paragraphs separated by double newlines"
-}}
-"""
+    def process_job(item):
+        """
+        Full per-job pipeline on a worker thread: LLM call, normalization,
+        LaTeX sanitization, render, file writes. Everything touched here is
+        thread-local or read-only (compiled templates and the identity/header
+        dicts are never mutated), so no locking is needed.
+        """
+        job, lang, prompt, out_dir = item
 
         data = call_ollama(prompt)
         if not data:
-            continue
+            return False
 
         # ------------------------------------------------------------------
         # NORMALIZE AI OUTPUT
@@ -190,62 +481,23 @@ RETURN PURE JSON ONLY:
         # IDENTITY (NEVER AI-GENERATED)
         # ------------------------------------------------------------------
 
-        data.update({
-            "first_name": "Hugo",
-            "last_name": "Schenegg",
-            "location": "Paris, France",
-            "phone": "+33 6 95 16 42 87",
-            "email": "schenegg.hugo@gmail.com",
-            "linkedin": "schenegghugo",
-            "company_name": job["company"],
-            "languages_string": (
-                "Français (natif) — Anglais (courant)"
-                if lang == "FR"
-                else "French (Native) — English (Fluent)"
-            ),
-            "cl_opening": "Madame, Monsieur," if lang == "FR" else "Dear Hiring Manager,",
-            "cl_closing": "Cordialement," if lang == "FR" else "Sincerely,",
-            "dates_current": "Jan 2022 – Present",
-            "role_current": "Studio Coordinator",
-            "company_current": "MPC Paris",
-            "location_current": "Paris, France",
-            "skills_dict": {
-                "Scripting": "Python, C++, Bash",
-                "Graphics": "OpenGL, Vulkan, Rendering Pipelines",
-                "Tools": "Git, Linux, Maya",
-            }
-        })
-
-        headers = {
-            "FR": {
-                "h_profile": "Profil",
-                "h_skills": "Compétences techniques",
-                "h_experience": "Expérience professionnelle",
-                "h_projects": "Projets",
-                "h_education": "Formation",
-                "h_attributes": "Compétences humaines",
-            },
-            "EN": {
-                "h_profile": "Profile",
-                "h_skills": "Technical Skills",
-                "h_experience": "Experience",
-                "h_projects": "Projects",
-                "h_education": "Education",
-                "h_attributes": "Attributes",
-            }
-        }
-
-        data.update(headers[lang])
+        data.update(_IDENTITY)
+        data.update(_HEADERS[lang])
+        data["company_name"] = job["company"]
+        data["languages_string"] = _LANGUAGES_STRING[lang]
+        data["cl_opening"] = _CL_OPENING[lang]
+        data["cl_closing"] = _CL_CLOSING[lang]
 
         # ------------------------------------------------------------------
         # LATEX SANITIZATION
         # ------------------------------------------------------------------
 
-        for k, v in data.items():
+        for k in _STRING_KEYS:
+            v = data.get(k)
             if isinstance(v, str):
-                data[k] = escape_tex(v.strip())
-            elif isinstance(v, list):
-                data[k] = [escape_tex(x) for x in v]
+                data[k] = escape_tex(v)
+        for k in _LIST_KEYS:
+            data[k] = [escape_tex(x) for x in data.get(k) or []]
 
         data["cover_letter_body"] = escape_tex(cover_text)
 
@@ -253,21 +505,32 @@ RETURN PURE JSON ONLY:
         # RENDER
         # ------------------------------------------------------------------
 
-        folder = re.sub(r"[^\w\-]+", "_", f"{job['company']}_{job['title']}")
-        out_dir = os.path.join(OUTPUT_DIR, folder)
         os.makedirs(out_dir, exist_ok=True)
 
-        with open(os.path.join(out_dir, "resume.tex"), "w") as f:
-            f.write(resume_tpl.render(data))
+        write_file(os.path.join(out_dir, "resume.tex"), resume_tpl.render(data))
+        write_file(os.path.join(out_dir, "cover.tex"), cover_tpl.render(data))
+        write_file(os.path.join(out_dir, "meta.json"),
+                   json.dumps({"prompt_sha": _cache_key(prompt)}))
 
-        with open(os.path.join(out_dir, "cover.tex"), "w") as f:
-            f.write(cover_tpl.render(data))
+        return True
 
-        cur.execute("UPDATE jobs SET status='generated' WHERE id=?", (job["id"],))
-        conn.commit()
+    console.print(f"[dim]Warming up {MODEL_NAME}...[/dim]")
+    prewarm_model()
+
+    console.print(f"[dim]Dispatching {len(pending)} jobs ({MAX_PARALLEL} in parallel)...[/dim]")
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL, len(pending))) as pool:
+        results = list(pool.map(process_job, pending))
 
-        console.print(f"[green]✅ Generated: {out_dir}[/green]")
+    for (job, lang, prompt, out_dir), ok in zip(pending, results):
+        console.print(f"[cyan]🤖 {job['company']} – {job['title']}[/cyan]")
+        if ok:
+            generated_ids.append((job["id"],))
+            console.print(f"[green]✅ Generated: {out_dir}[/green]")
 
+    # One batched UPDATE + commit instead of an fsync per job
+    if generated_ids:
+        cur.executemany("UPDATE jobs SET status='generated' WHERE id=?", generated_ids)
+        conn.commit()
     conn.close()
     console.print("\n[bold green]✨ Generation complete.[/bold green]")
 
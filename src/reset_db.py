@@ -1,12 +1,17 @@
 import sqlite3
 import os
-import glob
+import sys
 from rich.console import Console
 from rich.prompt import Confirm
 
+# Ensure imports work from project root
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.paths import BASE_DIR
+
 console = Console()
-DB_PATH = "data/db/jobs.db"
-RAW_DIR = "data/raw_jobs"
+DB_PATH = os.path.join(BASE_DIR, "data", "db", "jobs.db")
+RAW_DIR = os.path.join(BASE_DIR, "data", "raw_jobs")
 
 def run():
     console.print("[bold red]⚠️  WARNING: This will delete ALL scraped jobs and downloaded HTML files![/bold red]")
@@ -26,12 +31,16 @@ def run():
     except Exception as e:
         console.print(f"[red]❌ Failed to clean DB: {e}[/red]")
 
-    # 2. Clean Raw Files
+    # 2. Clean Raw Files (scandir streams entries with type info cached,
+    #    so no fnmatch pass or extra stat per file like glob needed)
     try:
-        files = glob.glob(os.path.join(RAW_DIR, "*.html"))
-        for f in files:
-            os.remove(f)
-        console.print(f"[green]✅ Deleted {len(files)} raw HTML files from {RAW_DIR}[/green]")
+        removed = 0
+        with os.scandir(RAW_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".html") and entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                    removed += 1
+        console.print(f"[green]✅ Deleted {removed} raw HTML files from {RAW_DIR}[/green]")
     except Exception as e:
         console.print(f"[red]❌ Failed to clean raw files: {e}[/red]")
 
@@ -1,14 +1,44 @@
 import sqlite3
 import os
 import re
+import sys
+import asyncio
 from rich.console import Console
-from rich.progress import track
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from lxml import etree
+from lxml import html as lxml_html
+
+# Ensure imports work from project root
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.paths import BASE_DIR
 
 console = Console()
-DB_PATH = "data/db/jobs.db"
-RAW_DIR = "data/raw_jobs"
+DB_PATH = os.path.join(BASE_DIR, "data", "db", "jobs.db")
+RAW_DIR = os.path.join(BASE_DIR, "data", "raw_jobs")
+
+# Worker coroutines, each owning one page; job postings are I/O-bound
+# navigations, so throughput scales with this until the link saturates
+CONCURRENCY = 4
+# Updates are committed in groups — one fsync per batch instead of per job,
+# while a crash mid-run still keeps everything flushed so far
+FLUSH_EVERY = 50
+
+# Only the text matters here; images, fonts and media just slow navigation
+# down. Stylesheets stay so layout-gated content still renders.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Compiled once; sanitize_filename runs three times per job. \w keeps this
+# Unicode-aware (accented titles survive), which rules out a bytes-level
+# translate table — the precompiled patterns are the cheap correct version.
+_NON_WORD_RE = re.compile(r'[^\w\-_]')
+_COLLAPSE_RE = re.compile(r'_+')
 
 def sanitize_filename(text):
     """
@@ -17,85 +47,163 @@ def sanitize_filename(text):
     """
     if not text:
         return "Unknown"
-    # Replace non-alphanumeric chars with underscore
-    clean = re.sub(r'[^\w\-_]', '_', text)
-    # Remove multiple underscores
-    clean = re.sub(r'_+', '_', clean)
+    # Replace non-alphanumeric chars with underscore, then collapse runs
+    clean = _NON_WORD_RE.sub('_', text)
+    clean = _COLLAPSE_RE.sub('_', clean)
     return clean.strip('_')
 
+def extract_text(html):
+    """
+    Flattens a page to newline-separated text straight off lxml's C tree.
+    BeautifulSoup built a full Python wrapper object per node just so
+    get_text could throw the tags away; itertext walks the same lxml tree
+    without any of that. Script and style subtrees are dropped first, like
+    get_text(separator='\\n', strip=True) drops them — this text becomes
+    the stored description, so inline JS/CSS must not leak into it.
+    """
+    tree = lxml_html.fromstring(html)
+    etree.strip_elements(tree, "script", "style", with_tail=False)
+    return "\n".join(t for t in (s.strip() for s in tree.itertext()) if t)
+
 def get_new_jobs():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
+    # Partial index over unscraped rows only: the pending lookup stays an
+    # index hit as the table grows, and the index stays tiny because rows
+    # fall out of it once their description lands
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_pending "
+        "ON jobs(status) WHERE description IS NULL"
+    )
     cursor.execute("SELECT * FROM jobs WHERE description IS NULL AND status != 'ignored'")
     jobs = cursor.fetchall()
     conn.close()
     return jobs
 
-def update_job_description(job_id, description, raw_path):
+def flush_updates(updates):
+    """Writes and clears the pending (description, path, id) batch."""
+    if not updates:
+        return
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE jobs 
-        SET description = ?, status = 'scraped', apply_url = ? 
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executemany("""
+        UPDATE jobs
+        SET description = ?, status = 'scraped', apply_url = ?
         WHERE id = ?
-    """, (description, raw_path, job_id)) # Note: Storing path helps debug, though URL is standard
+    """, updates)  # Note: Storing path helps debug, though URL is standard
     conn.commit()
     conn.close()
+    updates.clear()
 
-def run():
-    jobs = get_new_jobs()
-    if not jobs:
-        console.print("[yellow]No pending jobs to scrape details for.[/yellow]")
-        return
+def _write_raw(filepath, html):
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(html)
 
-    console.print(f"[bold cyan]🚀 Fetching details for {len(jobs)} jobs...[/bold cyan]")
-    console.print(f"[dim]Network Timeout set to 45s for roaming connection[/dim]")
+async def _scrape_job(page, job):
+    """Navigates one posting and returns its DB update tuple, or None."""
+    await page.goto(job['apply_url'], timeout=45000, wait_until="domcontentloaded")
+    # Wait for the network to settle rather than a flat 2s: static postings
+    # continue in a few hundred ms, pages that never idle fall through at
+    # the cap with what they have
+    try:
+        await page.wait_for_load_state("networkidle", timeout=3000)
+    except PlaywrightTimeout:
+        pass
+
+    html = await page.content()
+    text_content = extract_text(html)
+
+    # --- FILENAME LOGIC ---
+    clean_company = sanitize_filename(job['company'])
+    clean_title = sanitize_filename(job['title'])
+    clean_loc = sanitize_filename(job['location'])
+    # We keep the hash at the end to prevent overwriting if two jobs have same name
+    short_id = job['id'][:6]
+
+    filename = f"{clean_company}__{clean_title}__{clean_loc}__{short_id}.html"
+    filepath = os.path.join(RAW_DIR, filename)
+
+    # The archive write is the one blocking syscall left in the worker;
+    # pushing it to a thread keeps the other pages' navigations serviced
+    await asyncio.to_thread(_write_raw, filepath, html)
+
+    return (text_content, filepath, job['id'])
+
+async def _worker(context, queue, updates):
+    """
+    Drains jobs off the shared queue with one persistent page. A timeout
+    gets one retry on a freshly created page — reusing a wedged page just
+    times the retry out too.
+    """
+    page = await context.new_page()
+    try:
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        
-        for job in track(jobs, description="Scraping..."):
-            page = context.new_page()
-            
             for attempt in range(2):
                 try:
-                    page.goto(job['apply_url'], timeout=45000, wait_until="domcontentloaded")
-                    page.wait_for_timeout(2000)
-
-                    html = page.content()
-                    soup = BeautifulSoup(html, 'lxml')
-                    text_content = soup.get_text(separator='\n', strip=True)
-                    
-                    # --- NEW FILENAME LOGIC ---
-                    clean_company = sanitize_filename(job['company'])
-                    clean_title = sanitize_filename(job['title'])
-                    clean_loc = sanitize_filename(job['location'])
-                    # We keep the hash at the end to prevent overwriting if two jobs have same name
-                    short_id = job['id'][:6] 
-                    
-                    filename = f"{clean_company}__{clean_title}__{clean_loc}__{short_id}.html"
-                    filepath = os.path.join(RAW_DIR, filename)
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(html)
-                    
-                    update_job_description(job['id'], text_content, filepath)
+                    update = await _scrape_job(page, job)
+                    updates.append(update)
+                    console.print(f"[dim]📄 {job['company']} – {job['title']}[/dim]")
+                    if len(updates) >= FLUSH_EVERY:
+                        # Snapshot-and-clear, then commit in a thread: the
+                        # connect + executemany + fsync would otherwise stall
+                        # every in-flight navigation, and clearing first lets
+                        # the other workers keep appending meanwhile
+                        batch = updates[:]
+                        updates.clear()
+                        await asyncio.to_thread(flush_updates, batch)
                     break
-                    
                 except PlaywrightTimeout:
+                    await page.close()
+                    page = await context.new_page()
                     if attempt == 1:
                         console.print(f"[red]❌ Timeout on {job['company']} (Skipping)[/red]")
                 except Exception as e:
                     console.print(f"[red]❌ Error on {job['apply_url']}: {e}[/red]")
                     break
-            
-            page.close()
-        
-        browser.close()
+    finally:
+        await page.close()
+
+async def _run_async(jobs):
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    updates = []
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        )
+        await context.route("**/*", _block_heavy_resources)
+
+        workers = [
+            asyncio.create_task(_worker(context, queue, updates))
+            for _ in range(min(CONCURRENCY, len(jobs)))
+        ]
+        await asyncio.gather(*workers)
+
+        await browser.close()
+
+    flush_updates(updates)
+
+def run():
+    jobs = get_new_jobs()
+    if not jobs:
+        console.print("[yellow]No pending jobs to scrape details for.[/yellow]")
+        return
+
+    console.print(f"[bold cyan]🚀 Fetching details for {len(jobs)} jobs...[/bold cyan]")
+    console.print(f"[dim]Network Timeout set to 45s for roaming connection[/dim]")
+
+    asyncio.run(_run_async(jobs))
 
     console.print("[bold green]✨ Detailed scrape complete![/bold green]")
 
@@ -1,3 +1,4 @@
+import re
 from typing import Callable, Optional
 from urllib.parse import urlparse
 
@@ -12,16 +13,29 @@ from src.scrapers.unified_parser import (
     parse_workable
 )
 
-ATS_RULES = [
-    ("teamtailor.com", parse_teamtailor, "Teamtailor"),
-    ("greenhouse.io", parse_greenhouse, "Greenhouse"),
-    ("boards.greenhouse.io", parse_greenhouse, "Greenhouse"),
-    ("lever.co", parse_lever, "Lever"),
-    ("ashbyhq.com", parse_ashby, "Ashby"),
-    ("myworkdayjobs.com", parse_workday, "Workday"),
-    ("smartrecruiters.com", parse_smartrecruiters, "SmartRecruiters"),
-    ("workable.com", parse_workable, "Workable"),
-]
+# Parser per ATS, keyed by the regex group that recognizes its domain
+PARSERS = {
+    "teamtailor": (parse_teamtailor, "Teamtailor"),
+    "greenhouse": (parse_greenhouse, "Greenhouse"),
+    "lever": (parse_lever, "Lever"),
+    "ashby": (parse_ashby, "Ashby"),
+    "workday": (parse_workday, "Workday"),
+    "smartrecruiters": (parse_smartrecruiters, "SmartRecruiters"),
+    "workable": (parse_workable, "Workable"),
+}
+
+# All ATS signatures in one compiled alternation: detection is a single
+# C-level search instead of one substring probe per known provider.
+# (boards.greenhouse.io is covered by the greenhouse.io branch.)
+_ATS_RE = re.compile(
+    r"(?P<teamtailor>teamtailor\.com)"
+    r"|(?P<greenhouse>greenhouse\.io)"
+    r"|(?P<lever>lever\.co)"
+    r"|(?P<ashby>ashbyhq\.com)"
+    r"|(?P<workday>myworkdayjobs\.com)"
+    r"|(?P<smartrecruiters>smartrecruiters\.com)"
+    r"|(?P<workable>workable\.com)"
+)
 
 def detect_ats(url: str) -> Optional[tuple[Callable, str]]:
     """
@@ -29,8 +43,8 @@ def detect_ats(url: str) -> Optional[tuple[Callable, str]]:
     """
     hostname = urlparse(url).netloc.lower()
 
-    for domain, parser, name in ATS_RULES:
-        if domain in hostname:
-            return parser, name
+    m = _ATS_RE.search(hostname)
+    if m:
+        return PARSERS[m.lastgroup]
 
     return None
@@ -0,0 +1,29 @@
+import sys
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class JobSchema:
+    """
+    One parsed job listing, shared by every parser.
+
+    A plain slots dataclass rather than a Pydantic model: parsers build
+    these from strings they just extracted themselves, so there is nothing
+    to validate, and slots construction is several times cheaper with no
+    per-instance __dict__.
+    """
+    title: str
+    location: str
+    url: str
+    company: str
+    ats_provider: str = "unknown"
+
+    def __post_init__(self):
+        # Across a run the same few locations, company names and provider
+        # tags repeat on every listing; interning makes all instances share
+        # one string object each, shrinking the batch and turning later
+        # equality checks into pointer compares. Titles and URLs stay
+        # uninterned — they are near-unique, so pooling them only grows
+        # the intern table.
+        self.location = sys.intern(self.location)
+        self.company = sys.intern(self.company)
+        self.ats_provider = sys.intern(self.ats_provider)
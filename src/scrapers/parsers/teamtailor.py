@@ -36,8 +36,8 @@ def parse_teamtailor(html_content: str, company_name: str) -> List[JobSchema]:
 
         href = link.get('href', '')
         
-        # Strict Filter
-        if '/jobs/' not in href or len(href.split('/')) < 3:
+        # Strict Filter (count slashes directly — no throwaway list from split)
+        if '/jobs/' not in href or href.count('/') < 2:
             continue
             
         if href in seen_urls:
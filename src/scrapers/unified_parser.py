@@ -1,18 +1,8 @@
 import re
-from bs4 import BeautifulSoup
-from pydantic import BaseModel
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import List
 
-# ============================================================
-# Shared schema
-# ============================================================
-
-class JobSchema(BaseModel):
-    title: str
-    location: str
-    url: str
-    company: str
-    ats_provider: str = "simple_html"
+from src.scrapers.job_schema import JobSchema
 
 # ============================================================
 # Shared Helpers
@@ -29,12 +19,69 @@ ROLE_KEYWORDS = [
     "lead", "head of", "intern", "trainee"
 ]
 
+# All role keywords as one compiled alternation: a title is scanned in a
+# single C-level pass instead of up to len(ROLE_KEYWORDS) substring probes,
+# and IGNORECASE replaces the per-call .lower() copy. Plain substring
+# semantics are kept (no word anchors), matching the old `in` checks.
+_ROLE_RE = re.compile(
+    "|".join(sorted((re.escape(k) for k in ROLE_KEYWORDS), key=len, reverse=True)),
+    re.IGNORECASE
+)
+
 def matches_role(title: str) -> bool:
-    title_l = title.lower()
-    return any(k in title_l for k in ROLE_KEYWORDS)
+    return _ROLE_RE.search(title) is not None
+
+# Per-parser class/href patterns, compiled once: these run against every
+# candidate element, and busy boards have hundreds per page
+_RE_TT_CLASS = re.compile(r"(block-grid-item|job-list-item|candidate-job-item)")
+_RE_TT_HREF = re.compile(r"/jobs/\d+")
+_RE_TT_LOC = re.compile(r"(location|meta-location|text-md)")
+_RE_SIMPLE_HREF = re.compile(r"(job|career|position|opening)", re.I)
+
+def _class_contains(substr):
+    """
+    Class-attribute predicate for a fixed literal: BS4 calls it once per
+    class token, and plain containment skips the regex engine entirely.
+    """
+    def test(css_class):
+        return css_class is not None and substr in css_class
+    return test
+
+_LOC_CLASS = _class_contains("location")
+
+# Fallback bases for the relative hrefs each ATS emits
+_ASHBY_BASE = "https://jobs.ashbyhq.com"
+_GREENHOUSE_BASE = "https://boards.greenhouse.io"
+_LEVER_BASE = "https://jobs.lever.co"
+_SMARTRECRUITERS_BASE = "https://careers.smartrecruiters.com"
+_WORKABLE_BASE = "https://apply.workable.com"
+
+def _class_token(token):
+    """
+    Class-attribute predicate matching a single class token. At parse time
+    a strainer sees the raw class string, where a literal class_="x" means
+    exact full-attribute equality — an element with class="x extra" would be
+    dropped from the tree. Splitting restores find_all's token semantics.
+    """
+    def test(value):
+        return value is not None and token in value.split()
+    return test
+
+# Strainers restrict tree construction to the nodes a parser actually walks;
+# everything else is dropped during the parse, not after. Teamtailor and
+# Workday stay unstrained — they climb to parents/siblings that a strained
+# tree would not contain.
+_STRAIN_LINKS = SoupStrainer("a", href=True)
+_STRAIN_GH = SoupStrainer("div", class_=_class_token("opening"))
+_STRAIN_LEVER = SoupStrainer("a", class_=_class_token("posting-title"))
+_STRAIN_SMART = SoupStrainer("li", class_=_class_token("opening-job"))
+_STRAIN_WORKABLE = SoupStrainer("li", attrs={"data-ui": "job-opening"})
 
 def normalize_url(href: str, base: str) -> str:
-    if href.startswith("http"): return href
+    # Absolute URLs are the common case: one tuple startswith answers them
+    # without allocating. The explicit schemes also stop odd "http…" prefixed
+    # non-URLs slipping through the old bare "http" test.
+    if href.startswith(("http://", "https://")): return href
     if href.startswith("//"): return "https:" + href
     return base.rstrip("/") + "/" + href.lstrip("/")
 
@@ -43,7 +90,7 @@ def normalize_url(href: str, base: str) -> str:
 # ============================================================
 
 def parse_ashby(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_LINKS)
     jobs, seen_urls = [], set()
 
     for link in soup.find_all("a", href=True):
@@ -57,13 +104,13 @@ def parse_ashby(html_content: str, company_name: str, url: str) -> List[JobSchem
 
         jobs.append(JobSchema(
             title=title, location="Remote/Unknown",
-            url=normalize_url(href, "https://jobs.ashbyhq.com"),
+            url=normalize_url(href, _ASHBY_BASE),
             company=company_name, ats_provider="ashby"
         ))
     return jobs
 
 def parse_greenhouse(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_GH)
     jobs, seen_urls = [], set()
 
     for opening in soup.find_all("div", class_="opening"):
@@ -81,13 +128,13 @@ def parse_greenhouse(html_content: str, company_name: str, url: str) -> List[Job
 
         jobs.append(JobSchema(
             title=title, location=location,
-            url=normalize_url(href, "https://boards.greenhouse.io"),
+            url=normalize_url(href, _GREENHOUSE_BASE),
             company=company_name, ats_provider="greenhouse"
         ))
     return jobs
 
 def parse_lever(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_LEVER)
     jobs, seen_urls = [], set()
 
     for post in soup.find_all("a", class_="posting-title"):
@@ -104,7 +151,7 @@ def parse_lever(html_content: str, company_name: str, url: str) -> List[JobSchem
 
         jobs.append(JobSchema(
             title=title, location=location,
-            url=normalize_url(href, "https://jobs.lever.co"),
+            url=normalize_url(href, _LEVER_BASE),
             company=company_name, ats_provider="lever"
         ))
     return jobs
@@ -113,9 +160,9 @@ def parse_teamtailor(html_content: str, company_name: str, url: str) -> List[Job
     soup = BeautifulSoup(html_content, "lxml")
     jobs, seen_urls = [], set()
 
-    candidates = soup.find_all(["li", "div", "a"], class_=re.compile(r"(block-grid-item|job-list-item|candidate-job-item)"))
+    candidates = soup.find_all(["li", "div", "a"], class_=_RE_TT_CLASS)
     if not candidates:
-        candidates = soup.find_all("a", href=re.compile(r"/jobs/\d+"))
+        candidates = soup.find_all("a", href=_RE_TT_HREF)
 
     for item in candidates:
         link = item if item.name == "a" else item.find("a", href=True)
@@ -128,7 +175,7 @@ def parse_teamtailor(html_content: str, company_name: str, url: str) -> List[Job
         title = title_tag.get_text(strip=True) if title_tag else next(iter(link.stripped_strings), "Unknown Role")
         if not matches_role(title): continue
 
-        loc = item.find(class_=re.compile(r"(location|meta-location|text-md)"))
+        loc = item.find(class_=_RE_TT_LOC)
         location = loc.get_text(strip=True) if loc else "Remote/Stockholm"
         
         full_url = href if href.startswith("http") else f"https:{href}"
@@ -164,7 +211,7 @@ def parse_workday(html_content: str, company_name: str, url: str) -> List[JobSch
     return jobs
 
 def parse_smartrecruiters(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_SMART)
     jobs, seen_urls = [], set()
 
     for item in soup.select("li.opening-job"):
@@ -178,18 +225,18 @@ def parse_smartrecruiters(html_content: str, company_name: str, url: str) -> Lis
         title = title_tag.get_text(strip=True) if title_tag else link.get_text(strip=True)
         if not matches_role(title): continue
 
-        loc = item.find("span", class_=re.compile("location"))
+        loc = item.find("span", class_=_LOC_CLASS)
         location = loc.get_text(strip=True) if loc else "Remote/Unknown"
 
         jobs.append(JobSchema(
             title=title, location=location,
-            url=normalize_url(href, "https://careers.smartrecruiters.com"),
+            url=normalize_url(href, _SMARTRECRUITERS_BASE),
             company=company_name, ats_provider="smartrecruiters"
         ))
     return jobs
 
 def parse_workable(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_WORKABLE)
     jobs, seen_urls = [], set()
 
     for item in soup.select('li[data-ui="job-opening"]'):
@@ -203,23 +250,30 @@ def parse_workable(html_content: str, company_name: str, url: str) -> List[JobSc
         title = title_tag.get_text(strip=True) if title_tag else link.get_text(strip=True)
         if not matches_role(title): continue
 
-        loc = item.find("span", class_=re.compile("location"))
+        loc = item.find("span", class_=_LOC_CLASS)
         location = loc.get_text(strip=True) if loc else "Remote/Unknown"
 
         jobs.append(JobSchema(
             title=title, location=location,
-            url=normalize_url(href, "https://apply.workable.com"),
+            url=normalize_url(href, _WORKABLE_BASE),
             company=company_name, ats_provider="workable"
         ))
     return jobs
 
 def parse_simple(html_content: str, company_name: str, url: str) -> List[JobSchema]:
-    soup = BeautifulSoup(html_content, "lxml")
+    # Prefilter on the raw markup: if no role keyword appears anywhere in the
+    # page, no link title can match either, and the whole tree build is
+    # skipped. One C-level scan; conservative, since keywords may also hit
+    # inside tags or scripts, in which case we just parse as before.
+    if _ROLE_RE.search(html_content) is None:
+        return []
+
+    soup = BeautifulSoup(html_content, "lxml", parse_only=_STRAIN_LINKS)
     jobs, seen_urls = [], set()
 
     for link in soup.find_all("a", href=True):
         href = link["href"]
-        if not re.search(r"(job|career|position|opening)", href, re.I): continue
+        if not _RE_SIMPLE_HREF.search(href): continue
         if href in seen_urls: continue
         
         title = link.get_text(strip=True)
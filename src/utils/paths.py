@@ -0,0 +1,7 @@
+import os
+
+# Repository root, resolved once from this file's location instead of the
+# working directory. Every module joins its data/config paths off this one
+# constant, so the pipeline behaves the same regardless of where it is
+# launched from — no repeated getcwd() calls, no cwd-dependent breakage.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))